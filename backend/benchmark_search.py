@@ -0,0 +1,131 @@
+"""Compare searchInsights against pulling listInsights and filtering client side.
+
+Generates a corpus of insights under a throwaway workflow, runs both queries through
+the full schema a few times and prints timings and payload sizes, then removes the corpus.
+Words are drawn from a Zipf-like distribution over VOCABULARY_SIZE terms, so the default
+cases cover a common, a medium and a rare term.
+
+    python benchmark_search.py --rows 200000 --text accuracy --text tok3999
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from db import connect, disconnect, database
+from schema_full import schema
+
+VOCABULARY_SIZE = 5000
+WORDS = [
+    "accuracy", "baseline", "calibration", "drift", "error", "feature", "holdout",
+    "latency", "leakage", "metric", "outlier", "precision", "recall", "regression",
+    "sample", "skew", "stable", "threshold", "variance", "warning",
+]
+WORDS += [f"tok{i}" for i in range(len(WORDS), VOCABULARY_SIZE)]
+# word k (1-based) appears in roughly 1 - (1 - ln(1 + 1/k) / ln(VOCABULARY_SIZE)) ** 40 of rows
+DEFAULT_TEXTS = [WORDS[0], WORDS[99], WORDS[3999]]
+
+LIST_QUERY = """
+query {
+  listInsights { id name data workflowId executionId }
+}
+"""
+
+SEARCH_QUERY = """
+query Search($text: String!, $workflowId: Int, $first: Int!) {
+  searchInsights(text: $text, workflowId: $workflowId, first: $first) {
+    edges { rank snippet node { id name data workflowId executionId } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+
+async def populate(rows: int) -> int:
+    wf = await database.fetch_one(
+        "INSERT INTO workflows (name) VALUES ('Search benchmark') RETURNING *"
+    )
+    ex = await database.fetch_one(
+        "INSERT INTO executions (name, workflow_id) VALUES ('Search benchmark run', :wf_id) RETURNING *",
+        {"wf_id": wf["id"]},
+    )
+    # the inner WHERE references n so every row gets its own random sentence;
+    # floor(size ^ random()) picks word k with probability ~ 1 / k
+    query = """
+    WITH w AS (SELECT CAST(:words AS text[]) AS words)
+    INSERT INTO insights (name, data, workflow_id, execution_id)
+    SELECT 'QA ' || n,
+           (SELECT string_agg(w.words[floor(power(cardinality(w.words), random()))::int], ' ')
+            FROM w, generate_series(1, 40) WHERE n > 0),
+           :wf_id, :ex_id
+    FROM generate_series(1, :rows) AS n
+    """
+    await database.execute(
+        query,
+        {
+            "words": WORDS,
+            "wf_id": wf["id"],
+            "ex_id": ex["id"],
+            "rows": rows,
+        },
+    )
+    await database.execute("ANALYZE insights")
+    return wf["id"]
+
+
+async def cleanup(workflow_id: int):
+    await database.execute(
+        "DELETE FROM insights WHERE workflow_id = :wf_id", {"wf_id": workflow_id}
+    )
+    await database.execute("DELETE FROM workflows WHERE id = :wf_id", {"wf_id": workflow_id})
+
+
+async def timed(query: str, variables: dict | None = None) -> tuple[float, dict]:
+    start = time.perf_counter()
+    result = await schema.execute(query, variable_values=variables)
+    elapsed = time.perf_counter() - start
+    if result.errors:
+        raise RuntimeError(result.errors)
+    return elapsed, result.data
+
+
+async def run(rows: int, texts: list[str], first: int, repeat: int):
+    await connect()
+    workflow_id = await populate(rows)
+    try:
+        for text in texts:
+            terms = text.lower().split()
+            for i in range(repeat):
+                list_time, data = await timed(LIST_QUERY)
+                start = time.perf_counter()
+                matches = [
+                    ins for ins in data["listInsights"]
+                    if set(terms) <= set((ins["data"] or "").lower().split())
+                ]
+                filter_time = time.perf_counter() - start
+                list_bytes = len(json.dumps(data))
+
+                search_time, data = await timed(
+                    SEARCH_QUERY, {"text": text, "workflowId": workflow_id, "first": first}
+                )
+                search_bytes = len(json.dumps(data))
+
+                print(
+                    f"{text!r} run {i + 1}: listInsights {list_time * 1000:.0f} ms + filter "
+                    f"{filter_time * 1000:.0f} ms, {list_bytes / 1e6:.1f} MB, "
+                    f"{len(matches)} matches | searchInsights {search_time * 1000:.0f} ms, "
+                    f"{search_bytes / 1e3:.1f} kB, first {first} ranked"
+                )
+    finally:
+        await cleanup(workflow_id)
+        await disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--text", action="append", dest="texts")
+    parser.add_argument("--first", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.texts or DEFAULT_TEXTS, args.first, args.repeat))
@@ -6,10 +6,32 @@ class DbManagementMutation:
     @strawberry.mutation
     async def clear_all_data(self) -> bool:
         await database.execute(
-            "TRUNCATE TABLE tag_assignments, tags, models, insights, executions, workflows CASCADE"
+            "TRUNCATE TABLE tag_assignments, tags, models, insights, executions, workflows, "
+            "workflow_activity_daily CASCADE"
         )
         return True
 
+    @strawberry.mutation
+    async def rebuild_workflow_activity(self) -> bool:
+        # backfill the rollup from scratch, e.g. after bulk loads that bypassed the triggers
+        async with database.transaction():
+            await database.execute("TRUNCATE TABLE workflow_activity_daily")
+            await database.execute("""
+            INSERT INTO workflow_activity_daily (workflow_id, day, executions, models)
+            SELECT workflow_id, day, SUM(executions), SUM(models) FROM (
+                SELECT workflow_id, created_at::date AS day, 1 AS executions, 0 AS models
+                FROM executions
+                WHERE workflow_id IS NOT NULL
+                UNION ALL
+                SELECT e.workflow_id, m.created_at::date, 0, 1
+                FROM models m
+                JOIN executions e ON e.id = m.execution_id
+                WHERE e.workflow_id IS NOT NULL
+            ) activity
+            GROUP BY workflow_id, day
+            """)
+        return True
+
     @strawberry.mutation
     async def populate_sample_data(self) -> bool:
         wf = await database.fetch_one(
@@ -98,11 +120,19 @@ class DbManagementMutation:
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             execution_id INT REFERENCES executions(id) ON DELETE SET NULL,
             workflow_id INT REFERENCES workflows(id) ON DELETE SET NULL,
-            model_id INT REFERENCES models(id) ON DELETE SET NULL
+            model_id INT REFERENCES models(id) ON DELETE SET NULL,
+            search_vector TSVECTOR GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(data, '')), 'B')
+            ) STORED
         )
         """
         _ = await database.fetch_one(query)
         query = """
+        CREATE INDEX insights_search_vector_idx ON insights USING GIN (search_vector)
+        """
+        _ = await database.fetch_one(query)
+        query = """
         CREATE TYPE tag_target_type AS ENUM ('workflow', 'execution', 'insight', 'model')
         """
         _ = await database.fetch_one(query)
@@ -125,4 +155,105 @@ class DbManagementMutation:
         )
         """
         _ = await database.fetch_one(query)
+        await create_workflow_activity_rollup()
         return True
+
+
+async def create_workflow_activity_rollup():
+    # per workflow per day counts, kept current by the triggers below and
+    # rebuilt from scratch by rebuild_workflow_activity
+    query = """
+    CREATE TABLE workflow_activity_daily (
+        workflow_id INT NOT NULL,
+        day DATE NOT NULL,
+        executions INT NOT NULL DEFAULT 0,
+        models INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (workflow_id, day)
+    )
+    """
+    _ = await database.fetch_one(query)
+    query = """
+    CREATE FUNCTION workflow_activity_add(
+        p_workflow_id INT, p_day DATE, p_executions INT, p_models INT
+    ) RETURNS void AS $$
+    BEGIN
+        IF p_workflow_id IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO workflow_activity_daily AS a (workflow_id, day, executions, models)
+        VALUES (p_workflow_id, p_day, p_executions, p_models)
+        ON CONFLICT (workflow_id, day) DO UPDATE
+        SET executions = a.executions + EXCLUDED.executions,
+            models = a.models + EXCLUDED.models;
+        -- drop emptied days so deleted executions and workflows leave nothing behind
+        IF p_executions < 0 OR p_models < 0 THEN
+            DELETE FROM workflow_activity_daily
+            WHERE workflow_id = p_workflow_id AND day = p_day
+                AND executions = 0 AND models = 0;
+        END IF;
+    END
+    $$ LANGUAGE plpgsql
+    """
+    _ = await database.fetch_one(query)
+    # executions are removed BEFORE delete so their models can still be counted
+    # off; the models SET NULL that follows then finds no execution and is a no-op
+    query = """
+    CREATE FUNCTION workflow_activity_on_execution() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM workflow_activity_add(NEW.workflow_id, NEW.created_at::date, 1, 0);
+            RETURN NULL;
+        END IF;
+        PERFORM workflow_activity_add(OLD.workflow_id, OLD.created_at::date, -1, 0);
+        PERFORM workflow_activity_add(OLD.workflow_id, m.day, 0, -m.n)
+        FROM (
+            SELECT created_at::date AS day, COUNT(*)::int AS n
+            FROM models WHERE execution_id = OLD.id
+            GROUP BY 1
+        ) m;
+        RETURN OLD;
+    END
+    $$ LANGUAGE plpgsql
+    """
+    _ = await database.fetch_one(query)
+    query = """
+    CREATE FUNCTION workflow_activity_on_model() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM workflow_activity_add(
+                (SELECT workflow_id FROM executions WHERE id = OLD.execution_id),
+                OLD.created_at::date, 0, -1
+            );
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM workflow_activity_add(
+                (SELECT workflow_id FROM executions WHERE id = NEW.execution_id),
+                NEW.created_at::date, 0, 1
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """
+    _ = await database.fetch_one(query)
+    query = """
+    CREATE TRIGGER executions_activity_insert AFTER INSERT ON executions
+    FOR EACH ROW EXECUTE FUNCTION workflow_activity_on_execution()
+    """
+    _ = await database.fetch_one(query)
+    query = """
+    CREATE TRIGGER executions_activity_delete BEFORE DELETE ON executions
+    FOR EACH ROW EXECUTE FUNCTION workflow_activity_on_execution()
+    """
+    _ = await database.fetch_one(query)
+    query = """
+    CREATE TRIGGER models_activity AFTER INSERT OR DELETE ON models
+    FOR EACH ROW EXECUTE FUNCTION workflow_activity_on_model()
+    """
+    _ = await database.fetch_one(query)
+    query = """
+    CREATE TRIGGER models_activity_move AFTER UPDATE OF execution_id ON models
+    FOR EACH ROW WHEN (OLD.execution_id IS DISTINCT FROM NEW.execution_id)
+    EXECUTE FUNCTION workflow_activity_on_model()
+    """
+    _ = await database.fetch_one(query)
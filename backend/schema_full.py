@@ -1,12 +1,18 @@
+import base64
+import html
 from db import database
 import strawberry
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Annotated, Optional
 from strawberry.tools import merge_types
 from schema_db_management import DbManagementMutation
 
 # ------------- TYPES ------------- #
 
+# insights carries a generated search_vector column, so select the mapped columns explicitly
+INSIGHT_COLUMNS = "i.id, i.name, i.data, i.created_at, i.workflow_id, i.execution_id, i.model_id"
+
 
 @strawberry.type
 class Tag:
@@ -42,7 +48,7 @@ class Workflow:
 
     @strawberry.field
     async def insights(self) -> list["Insight"]:
-        query = "SELECT * FROM insights WHERE workflow_id = :id"
+        query = f"SELECT {INSIGHT_COLUMNS} FROM insights i WHERE i.workflow_id = :id"
         results = await database.fetch_all(query, {"id": self.id})
         return [Insight(**r) for r in results]
 
@@ -60,7 +66,7 @@ class Execution:
 
     @strawberry.field
     async def insights(self) -> list["Insight"]:
-        query = "SELECT * FROM insights WHERE execution_id = :id"
+        query = f"SELECT {INSIGHT_COLUMNS} FROM insights i WHERE i.execution_id = :id"
         results = await database.fetch_all(query, {"id": self.id})
         return [Insight(**r) for r in results]
 
@@ -89,7 +95,7 @@ class Model:
 
     @strawberry.field
     async def insights(self) -> list["Insight"]:
-        query = "SELECT * FROM insights WHERE model_id = :id"
+        query = f"SELECT {INSIGHT_COLUMNS} FROM insights i WHERE i.model_id = :id"
         results = await database.fetch_all(query, {"id": self.id})
         return [Insight(**r) for r in results]
 
@@ -149,6 +155,82 @@ class Insight:
         return Workflow(**row) if row else None
 
 
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    end_cursor: str | None
+
+
+@strawberry.type
+class InsightSearchEdge:
+    cursor: str
+    rank: float
+    snippet: str
+    node: Insight
+
+
+@strawberry.type
+class InsightSearchConnection:
+    edges: list[InsightSearchEdge]
+    page_info: PageInfo
+
+
+@strawberry.enum
+class ActivityBucket(Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+@strawberry.type
+class WorkflowActivity:
+    bucket_start: date
+    executions: int
+    models: int
+
+
+# bounds the work per activity request regardless of how much history exists
+ACTIVITY_MAX_BUCKETS = 366
+
+
+def count_buckets(date_from: date, date_to: date, bucket: ActivityBucket) -> int:
+    if bucket == ActivityBucket.DAY:
+        return (date_to - date_from).days + 1
+    if bucket == ActivityBucket.WEEK:
+        week_start = date_from - timedelta(days=date_from.weekday())
+        return (date_to - week_start).days // 7 + 1
+    return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+
+
+# search pages are ranked, so cursors encode the offset into the ranked result set
+SEARCH_MAX_PAGE_SIZE = 100
+# headlines are marked with private use characters, stripped from the source text,
+# so the snippet can be HTML escaped before the markers become <b> tags
+HEADLINE_START, HEADLINE_STOP = "\ue000", "\ue001"
+
+
+def render_headline(headline: str) -> str:
+    return (
+        html.escape(headline)
+        .replace(HEADLINE_START, "<b>")
+        .replace(HEADLINE_STOP, "</b>")
+    )
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.b64encode(f"offset:{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        prefix, offset = base64.b64decode(cursor).decode().split(":")
+        if prefix != "offset" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
 # ------------- INPUTS ------------- #
 
 
@@ -248,8 +330,8 @@ class Query:
         self, tag_key: Optional[str] = None, tag_value: Optional[str] = None
     ) -> list[Insight]:
         if tag_key and tag_value:
-            query = """
-            SELECT i.* FROM insights i
+            query = f"""
+            SELECT {INSIGHT_COLUMNS} FROM insights i
             JOIN tag_assignments ta ON ta.target_type = 'insight' AND ta.target_id = i.id
             JOIN tags t ON t.id = ta.tag_id
             WHERE t.key = :tag_key AND t.value = :tag_value
@@ -259,10 +341,126 @@ class Query:
                 query, {"tag_key": tag_key, "tag_value": tag_value}
             )
         else:
-            query = "SELECT * FROM insights ORDER BY created_at DESC"
+            query = f"SELECT {INSIGHT_COLUMNS} FROM insights i ORDER BY i.created_at DESC"
             rows = await database.fetch_all(query)
         return [Insight(**r) for r in rows]
 
+    @strawberry.field
+    async def search_insights(
+        self,
+        text: str,
+        workflow_id: Optional[int] = None,
+        execution_id: Optional[int] = None,
+        first: int = 20,
+        after: Optional[str] = None,
+    ) -> InsightSearchConnection:
+        first = max(1, min(first, SEARCH_MAX_PAGE_SIZE))
+        offset = decode_cursor(after) + 1 if after else 0
+        conditions = ["i.search_vector @@ q.query"]
+        parameters = {
+            "text": text,
+            "limit": first + 1,
+            "offset": offset,
+            "markers": HEADLINE_START + HEADLINE_STOP,
+            "headline_options": f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, MaxFragments=2",
+        }
+
+        if workflow_id is not None:
+            conditions.append("i.workflow_id = :workflow_id")
+            parameters["workflow_id"] = workflow_id
+
+        if execution_id is not None:
+            conditions.append("i.execution_id = :execution_id")
+            parameters["execution_id"] = execution_id
+
+        # rank and page first via the GIN index, then build headlines only for the page,
+        # from data when it matches and from name otherwise
+        query = f"""
+        WITH q AS (SELECT websearch_to_tsquery('english', :text) AS query),
+        hits AS (
+            SELECT {INSIGHT_COLUMNS}, ts_rank(i.search_vector, q.query) AS rank
+            FROM insights i, q
+            WHERE {' AND '.join(conditions)}
+            ORDER BY rank DESC, i.id
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT hits.*,
+            ts_headline(
+                'english',
+                translate(
+                    CASE WHEN to_tsvector('english', coalesce(hits.data, '')) @@ q.query
+                         THEN hits.data ELSE hits.name END,
+                    :markers, ''
+                ),
+                q.query, :headline_options
+            ) AS snippet
+        FROM hits, q
+        ORDER BY hits.rank DESC, hits.id
+        """
+        rows = await database.fetch_all(query, parameters)
+
+        edges = []
+        for position, r in enumerate(rows[:first], start=offset):
+            row = dict(r)
+            rank = row.pop("rank")
+            snippet = row.pop("snippet")
+            edges.append(
+                InsightSearchEdge(
+                    cursor=encode_cursor(position),
+                    rank=rank,
+                    snippet=render_headline(snippet),
+                    node=Insight(**row),
+                )
+            )
+        page_info = PageInfo(
+            has_next_page=len(rows) > first,
+            end_cursor=edges[-1].cursor if edges else None,
+        )
+        return InsightSearchConnection(edges=edges, page_info=page_info)
+
+    @strawberry.field
+    async def workflow_activity(
+        self,
+        workflow_id: int,
+        from_: Annotated[date, strawberry.argument(name="from")],
+        to: date,
+        bucket: ActivityBucket = ActivityBucket.DAY,
+    ) -> list[WorkflowActivity]:
+        if from_ > to:
+            raise ValueError(f"Invalid range: from {from_} is after to {to}")
+        if count_buckets(from_, to, bucket) > ACTIVITY_MAX_BUCKETS:
+            raise ValueError(
+                f"Range too large: at most {ACTIVITY_MAX_BUCKETS} {bucket.value} buckets per request"
+            )
+        # served from the daily rollup, so cost depends on the range, not on history
+        query = """
+        SELECT b.bucket_start::date AS bucket_start,
+               COALESCE(SUM(a.executions), 0)::int AS executions,
+               COALESCE(SUM(a.models), 0)::int AS models
+        FROM generate_series(
+            date_trunc(:bucket, CAST(:date_from AS date)::timestamp),
+            CAST(:date_to AS date)::timestamp,
+            CAST(:step AS text)::interval
+        ) AS b(bucket_start)
+        LEFT JOIN workflow_activity_daily a
+            ON a.workflow_id = :workflow_id
+            AND a.day BETWEEN CAST(:date_from AS date) AND CAST(:date_to AS date)
+            AND date_trunc(:bucket, a.day::timestamp) = b.bucket_start
+        GROUP BY b.bucket_start
+        ORDER BY b.bucket_start
+        """
+        rows = await database.fetch_all(
+            query,
+            {
+                "workflow_id": workflow_id,
+                "date_from": from_,
+                "date_to": to,
+                "bucket": bucket.value,
+                "step": f"1 {bucket.value}",
+            },
+        )
+        return [WorkflowActivity(**r) for r in rows]
+
     @strawberry.field
     async def list_models(
         self,
@@ -313,10 +511,10 @@ class Mutation:
 
     @strawberry.mutation
     async def create_insight(self, input: InsightInput) -> Insight:
-        query = """
-        INSERT INTO insights (name, data, workflow_id, execution_id, model_id)
+        query = f"""
+        INSERT INTO insights AS i (name, data, workflow_id, execution_id, model_id)
         VALUES (:name, :data, :workflow_id, :execution_id, :model_id)
-        RETURNING *
+        RETURNING {INSIGHT_COLUMNS}
         """
         row = await database.fetch_one(query, input.__dict__)
         return Insight(**row)